@@ -3,11 +3,27 @@ import pandas as pd
 import networkx as nx
 from pyvis.network import Network
 import streamlit.components.v1 as components
+import json
 import os
 import re
+import sys
 import plotly.express as px
-from itertools import combinations
-from collections import defaultdict
+from collections import Counter
+from itertools import chain
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj):
+    """JSON-encode obj with orjson when available (2-5x faster than stdlib)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _jinja_dumps(obj, **kwargs):
+    # signature matches Jinja's json.dumps_function policy hook
+    return _dumps(obj)
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -17,41 +33,277 @@ st.set_page_config(
 )
 
 # --- DATA & FUNCTIONS ---
-if not os.path.exists('temp'):
-    os.makedirs('temp')
+_AUTHOR_SPLIT_RE = re.compile(r'[,;]')
+
+def split_author_column(author_series):
+    """Parse a Series of raw author strings into clean name tuples.
+
+    pandas performs the regex split across the whole column at C level; the
+    remaining pass strips whitespace, drops empties, dedups order-preserving
+    (dict.fromkeys) and interns each name so every structure keyed on an
+    author shares one string object per name.
+    """
+    name_lists = author_series.str.split(_AUTHOR_SPLIT_RE)
+    return [
+        tuple(dict.fromkeys(sys.intern(a.strip()) for a in names if a.strip()))
+        if isinstance(names, list) else ()
+        for names in name_lists
+    ]
+
+_SIGMA_TEMPLATE = """
+<div id="sdg-network" style="width:100%;height:750px;background:#ffffff;"></div>
+<script src="https://cdn.jsdelivr.net/npm/graphology@0.25.4/dist/graphology.umd.min.js"></script>
+<script src="https://cdn.jsdelivr.net/npm/sigma@2.4.0/build/sigma.min.js"></script>
+<script>
+  const data = __GRAPH_DATA__;
+  const graph = graphology.Graph.from(data);
+  new Sigma(graph, document.getElementById("sdg-network"));
+</script>
+"""
+
+def render_webgl_html(G):
+    """Serialize the graph into a sigma.js WebGL page for very large views.
+
+    vis.js DOM rendering collapses above a few thousand nodes, while a WebGL
+    canvas stays interactive well past that, so oversized graphs keep full
+    detail instead of being aggregated away. Positions are laid out once in
+    Python since sigma does no physics of its own.
+    """
+    pos = nx.spring_layout(G, seed=42)
+    degrees = dict(G.degree())
+    payload = {
+        "nodes": [{"key": node,
+                   "attributes": {"label": node, "x": float(x), "y": float(y),
+                                  "size": 2 + degrees[node] ** 0.5,
+                                  "color": "#4b7bec"}}
+                  for node, (x, y) in pos.items()],
+        "edges": [{"source": u, "target": v, "attributes": {"color": "#d1d8e0"}}
+                  for u, v in G.edges()],
+    }
+    return _SIGMA_TEMPLATE.replace('__GRAPH_DATA__', _dumps(payload))
+
+def build_edges(df_mapped):
+    """Enumerate co-topic author pairs with pandas joins instead of Python loops.
+
+    Explodes author lists to (sdg, author) rows and self-merges on the SDG so
+    every author pair sharing a topic becomes one row. Returns a DataFrame
+    with columns ['sdg_mapping', 'author_x', 'author_y'], one row per
+    (SDG, pair); counting rows per pair gives the shared-SDG edge weight.
+    """
+    e = df_mapped[['sdg_mapping', 'authors_list']].explode('authors_list')
+    e = e.rename(columns={'authors_list': 'author'}).dropna(subset=['author'])
+    e = e.drop_duplicates()
+    m = e.merge(e, on='sdg_mapping')
+    return m[m['author_x'] < m['author_y']]
 
-def split_authors(author_string):
-    if not isinstance(author_string, str):
-        return []
-    authors = [a.strip() for a in re.split(r'[,;]', author_string) if a.strip()]
-    return authors
+def subgraph_for_selection(G, sdg_edges, selected_sdg):
+    """Materialize the graph view for one selectbox choice.
+
+    Filtered views are rebuilt from the per-SDG edge lists recorded at build
+    time, so they contain only collaborations attributable to the chosen SDG.
+    A node-induced subgraph of the global graph would also drag in edges the
+    same authors share through other SDGs (and would be a frozen view).
+    """
+    if selected_sdg == "- Show All -":
+        return G
+    H = nx.Graph()
+    H.add_edges_from(sdg_edges.get(selected_sdg, ()))
+    return H
 
 @st.cache_data
-def load_and_clean_data():
+def load_and_clean_data(data_mtime):
+    # data_mtime is only a cache key: it invalidates the cached frame when the
+    # CSV is replaced without Streamlit having to hash any real data. On-disk
+    # persistence is already covered by the Parquet snapshot below.
     try:
-        df = pd.read_csv('data_terpetakan_final.csv')
+        # Prefer the cleaned Parquet snapshot when it is newer than the CSV:
+        # columnar binary loads far faster than re-parsing and re-cleaning text.
+        parquet_path = 'data_terpetakan_final.parquet'
+        csv_path = 'data_terpetakan_final.csv'
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return pd.read_parquet(parquet_path, engine='pyarrow')
+
+        # Only five of the CSV's columns are ever used; skipping the abstract
+        # and title text plus the multithreaded pyarrow parser makes the cold
+        # parse several times faster.
+        df = pd.read_csv(csv_path, engine='pyarrow',
+                         usecols=['original_author', 'publication_year', 'journal',
+                                  'sdg_mapping', 'mapping_level'])
         original_rows = len(df)
         
         # --- ROBUST DATA CLEANING ---
-        # 1. CRITICAL: Drop rows where 'original_author' is missing (NaN) first.
-        df.dropna(subset=['original_author'], inplace=True)
+        # One combined validity mask and a single row-filter copy, instead of
+        # chained dropna/convert passes that each rewrite the whole frame.
+        year = pd.to_numeric(df['publication_year'], errors='coerce')
+        df = df.loc[df['original_author'].notna() & year.notna()].copy()
         cleaned_rows = len(df)
-        
-        st.sidebar.info(f"Loaded Data: Using {cleaned_rows} of {original_rows} rows (rows with empty author fields were removed).")
-
-        # 2. Safely apply other transformations
-        df['authors_list'] = df['original_author'].apply(split_authors)
-        df['publication_year'] = pd.to_numeric(df['publication_year'], errors='coerce')
-        df.dropna(subset=['publication_year'], inplace=True)
-        df['publication_year'] = df['publication_year'].astype(int)
-        df['journal'] = df['journal'].astype(str).str.strip().str.title()
-        df['journal'].replace(['Nan', ''], 'Not Available', inplace=True)
+
+        st.sidebar.info(f"Loaded Data: Using {cleaned_rows} of {original_rows} rows (rows with missing author or year fields were removed).")
+
+        df['publication_year'] = year.loc[df.index].astype(int)
+        df['authors_list'] = split_author_column(df['original_author'])
+        df['journal'] = (df['journal'].astype(str).str.strip().str.title()
+                         .replace({'Nan': 'Not Available', '': 'Not Available'}))
+        # Low-cardinality string columns: categorical codes make value_counts,
+        # groupby and equality masks integer operations and shrink the frame.
+        for col in ('sdg_mapping', 'journal', 'mapping_level'):
+            df[col] = df[col].astype('category')
+        try:
+            df.to_parquet(parquet_path, engine='pyarrow', compression='zstd')
+        except (ImportError, OSError):
+            pass  # no pyarrow or read-only deployment; just skip the snapshot
         return df
     except FileNotFoundError:
         st.error("Error: 'data_terpetakan_final.csv' not found.")
         return None
 
-df = load_and_clean_data()
+try:
+    _csv_mtime = os.path.getmtime('data_terpetakan_final.csv')
+except FileNotFoundError:
+    _csv_mtime = None
+df = load_and_clean_data(_csv_mtime)
+
+@st.cache_resource
+def build_collaboration_graph(data_mtime):
+    """Build the full collaboration graph once per dataset.
+
+    The graph only depends on the loaded dataset, so it is cached with
+    st.cache_resource and reused across reruns; widget interactions then
+    only pay for the cheap subgraph filter. `data_mtime` is only a cache
+    key: passing the CSV's modification time invalidates the graph when
+    the file is replaced, without hashing the DataFrame itself.
+    """
+    df_mapped = df[df['sdg_mapping'].notna()].copy()
+    pairs = build_edges(df_mapped)
+    weighted = pairs.groupby(['author_x', 'author_y']).size().reset_index(name='weight')
+    G = nx.from_pandas_edgelist(weighted, 'author_x', 'author_y', edge_attr='weight')
+    exploded = df_mapped[['sdg_mapping', 'authors_list']].explode('authors_list').dropna(subset=['authors_list'])
+    # agg(set) on a categorical column would try to coerce the sets back into
+    # categories, so aggregate over plain objects.
+    exploded['sdg_mapping'] = exploded['sdg_mapping'].astype(object)
+    author_sdg_map = exploded.groupby('authors_list')['sdg_mapping'].agg(set).to_dict()
+    # Hover titles are deterministic per author, so join the SDG sets into
+    # their display strings once here rather than on every render.
+    author_titles = {author: f"{author}<br><b>SDGs:</b> {', '.join(sorted(sdgs))}"
+                     for author, sdgs in author_sdg_map.items()}
+    # Per-SDG edge lists, recorded before the cross-SDG weight aggregation;
+    # subgraph_for_selection rebuilds filtered views from these.
+    sdg_edges = {sdg: list(zip(g['author_x'], g['author_y']))
+                 for sdg, g in pairs.groupby('sdg_mapping', observed=True)}
+    sdg_list = ["- Show All -"] + sorted(df['sdg_mapping'].dropna().unique().tolist())
+    return G, author_titles, sdg_edges, sdg_list
+
+def filter_by_degree(G, min_degree):
+    """Drop nodes with fewer than min_degree connections from the view.
+
+    Rendering cost should not scale with every degree-1 node in the corpus;
+    this lets the user trade completeness for interactivity.
+    """
+    if min_degree <= 1:
+        return G
+    return G.subgraph([n for n, d in G.degree() if d >= min_degree])
+
+@st.cache_data
+def render_network_html(data_mtime, selected_sdg, node_cap, min_degree=1):
+    """Render one network view to HTML and cache the string.
+
+    Revisiting a previously chosen SDG reuses the cached HTML instead of
+    re-running from_nx and the Jinja template. Only small scalars are used
+    as cache keys; the graph itself comes from the cached builder.
+    """
+    G, author_titles, sdg_edges, _ = build_collaboration_graph(data_mtime)
+    Sub_G = subgraph_for_selection(G, sdg_edges, selected_sdg)
+    Sub_G = filter_by_degree(Sub_G, min_degree)
+    if Sub_G.number_of_nodes() > node_cap:
+        return render_webgl_html(Sub_G)
+    # Remote CDN resources keep vis.js out of the generated document (the
+    # browser caches the library), shrinking the per-view HTML payload from
+    # roughly a megabyte to tens of kilobytes.
+    net = Network(height='750px', width='100%', notebook=False, cdn_resources='remote', directed=False)
+    if orjson is not None:
+        # pyvis serializes nodes/edges through Jinja's tojson policy;
+        # pointing it at orjson speeds up the dominant payload dump.
+        net.templateEnv.policies['json.dumps_function'] = _jinja_dumps
+    # Up to a few hundred nodes the in-browser physics stabilizes quickly and
+    # gives the nicest layout; beyond that it is the dominant render cost, so
+    # lay the graph out once in Python and freeze it instead.
+    if Sub_G.number_of_nodes() <= 300:
+        net.set_options("""
+        {
+          "physics": {
+            "solver": "forceAtlas2Based",
+            "forceAtlas2Based": {"gravitationalConstant": -50},
+            "stabilization": {"iterations": 100}
+          },
+          "edges": {"smooth": {"type": "discrete"}}
+        }
+        """)
+        pos = None
+    else:
+        net.set_options("""
+        {
+          "physics": {"enabled": false},
+          "edges": {"smooth": {"type": "discrete"}}
+        }
+        """)
+        pos = nx.spring_layout(Sub_G, seed=42, iterations=50)
+    # Feed pyvis in bulk rather than via from_nx, which re-iterates every
+    # node and edge through Python; attributes go in as parallel lists and
+    # the cached graph is never mutated.
+    degrees = dict(Sub_G.degree())
+    nodes = list(Sub_G.nodes())
+    node_kwargs = {
+        'label': nodes,
+        'title': [author_titles.get(n, n) for n in nodes],
+        'size': [10 + degrees[n] * 3 for n in nodes],
+    }
+    if pos is not None:
+        node_kwargs['x'] = [float(pos[n][0]) * 1000 for n in nodes]
+        node_kwargs['y'] = [float(pos[n][1]) * 1000 for n in nodes]
+    net.add_nodes(nodes, **node_kwargs)
+    net.add_edges([(u, v, d.get('weight', 1)) for u, v, d in Sub_G.edges(data=True)])
+    return net.generate_html(notebook=False)
+
+@st.cache_data
+def precompute_aggregates(data_mtime):
+    """Aggregate the General Analysis chart inputs once per dataset.
+
+    Flipping between pages used to redo every value_counts on each rerun;
+    now reruns just re-render these small cached frames. Like the graph
+    builder, `data_mtime` is only a cache key so a replaced CSV invalidates
+    the aggregates along with the reloaded DataFrame.
+    """
+    yearly_counts = df[df['publication_year'] > 1980]['publication_year'].value_counts().sort_index().reset_index()
+    yearly_counts.columns = ['Year', 'Count']
+    # A Counter over the list column beats explode + value_counts here: no
+    # intermediate row-per-author frame is ever materialized.
+    author_counts = Counter(chain.from_iterable(df['authors_list']))
+    top_authors = pd.DataFrame(author_counts.most_common(15), columns=['Researcher', 'Count']).iloc[::-1]
+    sdg_counts = df['sdg_mapping'].value_counts().reset_index()
+    sdg_counts.columns = ['SDG', 'Count']
+    mapping_counts = df['mapping_level'].value_counts().reset_index()
+    mapping_counts.columns = ['Level', 'Count']
+    return {'yearly': yearly_counts, 'top_authors': top_authors,
+            'sdg_counts': sdg_counts, 'mapping_counts': mapping_counts}
+
+@st.cache_data
+def make_bar_chart(data, **kwargs):
+    """Build (and cache) a px.bar figure from a small aggregated frame.
+
+    Constructing a plotly.express figure is surprisingly expensive; caching
+    on the aggregate keeps reruns to a lookup.
+    """
+    return px.bar(data, **kwargs)
+
+@st.cache_data
+def make_line_chart(data, **kwargs):
+    """Cached px.line counterpart to make_bar_chart."""
+    return px.line(data, **kwargs)
+
+@st.cache_data
+def make_pie_chart(data, **kwargs):
+    """Cached px.pie counterpart to make_bar_chart."""
+    return px.pie(data, **kwargs)
 
 # --- SDG DEFINITIONS ---
 sdg_definitions = {
@@ -63,48 +315,41 @@ sdg_definitions = {
     "SDG 13": "Climate Action", "SDG 14": "Life Below Water", "SDG 15": "Life on Land",
     "SDG 16": "Peace, Justice, and Strong Institutions", "SDG 17": "Partnerships for the Goals"
 }
+SDG_DEFINITIONS_MD = "\n\n".join(f"**{key}**: {value}" for key, value in sdg_definitions.items())
 
 # --- SIDEBAR NAVIGATION ---
 st.sidebar.title("Navigation 🗺️")
 page = st.sidebar.radio("Choose a page:", ["General Analysis", "Researcher Collaboration Network"])
 
 with st.sidebar.expander("ℹ️ About the SDGs"):
-    for key, value in sdg_definitions.items():
-        st.write(f"**{key}**: {value}")
+    st.markdown(SDG_DEFINITIONS_MD)
 
 # --- PAGE CONTENT ---
 if df is not None:
     if page == "General Analysis":
         st.title("📊 General Publication Analysis Dashboard")
         st.markdown("This page presents general insights from the publication dataset.")
+        aggregates = precompute_aggregates(_csv_mtime)
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("📈 Publication Trend by Year")
-            yearly_counts = df[df['publication_year'] > 1980]['publication_year'].value_counts().sort_index().reset_index()
-            yearly_counts.columns = ['Year', 'Count']
-            fig1 = px.line(yearly_counts, x='Year', y='Count', markers=True, labels={'Count': 'Number of Publications'})
+            fig1 = make_line_chart(aggregates['yearly'], x='Year', y='Count', markers=True, labels={'Count': 'Number of Publications'})
             st.plotly_chart(fig1, use_container_width=True)
 
             st.subheader("🏆 Top 15 Most Prolific Researchers")
-            all_authors_df = df.explode('authors_list').dropna(subset=['authors_list'])
-            if not all_authors_df.empty:
-                top_authors = all_authors_df['authors_list'].value_counts().nlargest(15).sort_values(ascending=True).reset_index()
-                top_authors.columns = ['Researcher', 'Count']
-                fig3 = px.bar(top_authors, y='Researcher', x='Count', orientation='h', text_auto=True, labels={'Count': 'Number of Publications'})
+            top_authors = aggregates['top_authors']
+            if not top_authors.empty:
+                fig3 = make_bar_chart(top_authors, y='Researcher', x='Count', orientation='h', text_auto=True, labels={'Count': 'Number of Publications'})
                 fig3.update_layout(yaxis={'categoryorder':'total ascending'})
                 st.plotly_chart(fig3, use_container_width=True)
             else:
                 st.warning("Could not generate the researcher chart due to missing or invalid author data in the source file.", icon="⚠️")
         with col2:
             st.subheader("🎯 Publication Distribution by SDG")
-            sdg_counts = df['sdg_mapping'].value_counts().reset_index()
-            sdg_counts.columns = ['SDG', 'Count']
-            fig2 = px.bar(sdg_counts, x='SDG', y='Count', color='SDG', text_auto=True)
+            fig2 = make_bar_chart(aggregates['sdg_counts'], x='SDG', y='Count', color='SDG', text_auto=True)
             st.plotly_chart(fig2, use_container_width=True)
             st.subheader("🔍 Mapping Level Proportions")
-            mapping_counts = df['mapping_level'].value_counts().reset_index()
-            mapping_counts.columns = ['Level', 'Count']
-            fig4 = px.pie(mapping_counts, names='Level', values='Count', hole=0.4)
+            fig4 = make_pie_chart(aggregates['mapping_counts'], names='Level', values='Count', hole=0.4)
             fig4.update_traces(textposition='inside', textinfo='percent+label')
             st.plotly_chart(fig4, use_container_width=True)
 
@@ -112,46 +357,23 @@ if df is not None:
         st.title("🤝 Potential Collaboration Network by SDG")
         st.markdown("This network connects researchers who have published work on the **same SDG topic**. Use the dropdown to filter the view.")
 
-        df_mapped = df[df['sdg_mapping'].notna()].copy()
-        collaboration_groups = df_mapped.groupby('sdg_mapping')['original_author'].unique()
-        G = nx.Graph()
-        author_sdg_map = defaultdict(set)
-        for sdg, authors in collaboration_groups.items():
-            unique_authors_in_sdg = {author.strip() for author_str in authors for author in split_authors(author_str) if author.strip()}
-            for author in unique_authors_in_sdg:
-                author_sdg_map[author].add(sdg)
-            for author1, author2 in combinations(unique_authors_in_sdg, 2):
-                if G.has_edge(author1, author2):
-                    G[author1][author2]['weight'] += 1
-                else:
-                    G.add_edge(author1, author2, weight=1)
-
-        sdg_list = ["- Show All -"] + sorted(df['sdg_mapping'].dropna().unique().tolist())
+        G, author_titles, sdg_edges, sdg_list = build_collaboration_graph(_csv_mtime)
+
         selected_sdg = st.selectbox('Select an SDG to filter the network:', sdg_list)
-        if selected_sdg != "- Show All -":
-            authors_in_selected_sdg = {author.strip() for author_str in collaboration_groups.get(selected_sdg, []) for author in split_authors(author_str) if author.strip()}
-            Sub_G = G.subgraph(authors_in_selected_sdg)
-        else:
-            Sub_G = G
+        Sub_G = subgraph_for_selection(G, sdg_edges, selected_sdg)
+        node_cap = st.slider('Node cap (larger graphs switch to WebGL rendering):', 500, 10000, 3000, step=500)
+        min_degree = st.slider('Minimum collaborations to display a researcher:', 1, 10, 1)
+        Sub_G = filter_by_degree(Sub_G, min_degree)
+        use_webgl = Sub_G.number_of_nodes() > node_cap
+        if use_webgl:
+            st.info(f"The graph exceeds {node_cap} nodes, so it is drawn on a WebGL canvas instead of the interactive vis.js view.")
         st.subheader("Graph Statistics")
         stats_col1, stats_col2 = st.columns(2)
         stats_col1.metric("Researchers Displayed (Nodes)", Sub_G.number_of_nodes())
         stats_col2.metric("Potential Collaborations (Edges)", Sub_G.number_of_edges())
         if Sub_G.number_of_nodes() > 0:
-            for node in Sub_G.nodes():
-                sdgs = author_sdg_map.get(node, set())
-                title = f"{node}<br><b>SDGs:</b> {', '.join(sorted(list(sdgs)))}" if sdgs else node
-                Sub_G.nodes[node]['title'] = title
-            net = Network(height='750px', width='100%', notebook=True, cdn_resources='in_line', directed=False)
-            net.from_nx(Sub_G)
-            for node in net.nodes:
-                node['size'] = 10 + Sub_G.degree(node['id']) * 3
             try:
-                path = os.path.join('temp', 'sdg_collaboration_graph.html')
-                net.save_graph(path)
-                with open(path, 'r', encoding='utf-8') as HtmlFile:
-                    source_code = HtmlFile.read()
-                    components.html(source_code, height=800, scrolling=True)
+                components.html(render_network_html(_csv_mtime, selected_sdg, node_cap, min_degree), height=800, scrolling=True)
             except Exception as e:
                 st.error(f"An error occurred while generating the graph: {e}")
         else: